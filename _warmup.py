@@ -0,0 +1,19 @@
+"""
+Numba önbelleğini ilk simülasyondan önce oluşturur.
+
+Kullanım:
+    python _warmup.py
+
+Önbellek varsayılan olarak __pycache__ altına yazılır; farklı bir
+dizin için NUMBA_CACHE_DIR ortam değişkeni kullanılabilir.
+"""
+
+import numpy as np
+
+from spc_system_v2 import inspection
+
+
+if __name__ == "__main__":
+    # Derlenmiş çekirdekleri örnek verilerle bir kez çağır
+    inspection(np.linspace(0.010, 0.016, 7), 0.010, 0.016, 0.004)
+    print("✓ Numba önbelleği hazır.")
@@ -4,8 +4,12 @@ Kamera Kontrollü Ambalaj Hatları için Gerçek Zamanlı
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+from numba import njit
+import argparse
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Üretim hatları için aylık veriler
@@ -20,17 +24,62 @@ PRODUCTION_LINES = {
     'Fourth Interior': {'monthly_production': 798000, 'monthly_defects': 11000}
 }
 
+# Vektörel simülasyon için hat verileri (PRODUCTION_LINES sırasıyla)
+LINE_NAMES = list(PRODUCTION_LINES.keys())
+N_LINES = len(LINE_NAMES)
+MONTHLY_PRODUCTION = np.array([d['monthly_production'] for d in PRODUCTION_LINES.values()], dtype=np.int64)
+MONTHLY_DEFECTS = np.array([d['monthly_defects'] for d in PRODUCTION_LINES.values()], dtype=np.int64)
 
-def mhConverter(monthly_production, monthly_defects, days=26, shifts=2, hours_per_shift=8, sigma=0.03):
+# Rastgele sayı üreteci (SFC64: NumPy'nin en hızlı bit üreteci)
+_RNG = np.random.default_rng(np.random.SFC64())
+
+# Saatlik veri tamponlarının başlangıç kapasitesi (dolunca iki katına çıkar)
+INITIAL_CAPACITY = 256
+
+# inspection_core tarafından döndürülen kural bitleri
+RULE_1 = 1 << 0        # Kontrol dışı nokta
+RULE_2 = 1 << 1        # Sistematik kayma
+RULE_3_UP = 1 << 2     # Artan trend
+RULE_3_DOWN = 1 << 3   # Azalan trend
+RULE_4 = 1 << 4        # Varyans artışı
+
+# Kural mesajları (sırası RULE_* bitleriyle aynı)
+_MESSAGES = (
+    "⚠️ KURAL 1: Kontrol dışı nokta tespit edildi! (UCL/LCL aşıldı)",
+    "⚠️ KURAL 2: Sistematik kayma tespit edildi! (7 ardışık nokta CL'nin aynı tarafında)",
+    "⚠️ KURAL 3: Artan trend tespit edildi! (6 ardışık artan nokta)",
+    "⚠️ KURAL 3: Azalan trend tespit edildi! (6 ardışık azalan nokta)",
+    "⚠️ KURAL 4: Varyans artışı olabilir! (4 nokta uçta kümelenmiş)",
+)
+
+# Kural tetiklenmediğinde gösterilen durum
+_OK = "✓ Süreç kontrol altında"
+
+
+def set_seed(seed=None):
+    """
+    Simülasyonun rastgele sayı üretecini yeniden başlatır.
+    
+    Parameters:
+    -----------
+    seed : int
+        Tohum değeri (None = rastgele, tekrarlanamaz)
+    """
+    global _RNG
+    _RNG = np.random.default_rng(np.random.SFC64(seed))
+
+
+def mhConverter(monthly_production, monthly_defects, days=26, shifts=2, hours_per_shift=8, sigma=0.03, size=None):
     """
     Aylık üretim verilerini saatlik verilere dönüştürür.
+    Tüm hatlar için tek seferde, dizi girdileriyle çalışır.
     
     Parameters:
     -----------
-    monthly_production : int
-        Aylık toplam üretim miktarı
-    monthly_defects : int
-        Aylık toplam hata sayısı
+    monthly_production : int veya np.ndarray
+        Aylık toplam üretim miktarı (hat başına)
+    monthly_defects : int veya np.ndarray
+        Aylık toplam hata sayısı (hat başına)
     days : int
         Aylık çalışma günü sayısı (varsayılan: 26)
     shifts : int
@@ -39,34 +88,38 @@ def mhConverter(monthly_production, monthly_defects, days=26, shifts=2, hours_pe
         Vardiya başına saat (varsayılan: 8)
     sigma : float
         Varyasyon parametresi (varsayılan: 0.03)
+    size : int veya tuple
+        Çıktı boyutu (varsayılan: girdilerin boyutu)
     
     Returns:
     --------
-    tuple : (hourly_production, hourly_defects, failure_rate)
+    tuple : (hourly_production, hourly_defects, failure_rate) dizileri
     """
     # Toplam çalışma saati
     total_hours = days * shifts * hours_per_shift
     
     # Ortalama saatlik üretim
-    avg_hourly_production = monthly_production / total_hours
+    avg_hourly_production = np.asarray(monthly_production) / total_hours
     
-    # Normal dağılımla saatlik üretim simülasyonu
-    hourly_production = int(np.random.normal(
+    # Normal dağılımla saatlik üretim simülasyonu (en az 1 adet)
+    # (skaler girdide de dizi dönmesi için np.asarray)
+    hourly_production = np.maximum(1, np.asarray(_RNG.normal(
         loc=avg_hourly_production,
-        scale=avg_hourly_production * sigma
-    ))
+        scale=avg_hourly_production * sigma,
+        size=size
+    )).astype(np.int64))
     
     # Hata oranı
-    defect_rate = monthly_defects / monthly_production
+    defect_rate = np.asarray(monthly_defects) / np.asarray(monthly_production)
     
     # Beklenen saatlik hata sayısı
     expected_hourly_defects = defect_rate * hourly_production
     
     # Poisson dağılımı ile saatlik hata simülasyonu
-    hourly_defects = np.random.poisson(lam=expected_hourly_defects)
+    hourly_defects = _RNG.poisson(lam=expected_hourly_defects)
     
-    # Saatlik hata oranı
-    failure_rate = hourly_defects / hourly_production if hourly_production > 0 else 0
+    # Saatlik hata oranı (üretim en az 1 olduğundan sıfıra bölme yok)
+    failure_rate = hourly_defects / hourly_production
     
     return hourly_production, hourly_defects, failure_rate
 
@@ -74,196 +127,394 @@ def mhConverter(monthly_production, monthly_defects, days=26, shifts=2, hours_pe
 def calculate_control_limits(failure_rates, production_counts):
     """
     p-chart kontrol limitlerini hesaplar.
+    İki boyutlu girdilerde (saat x hat) her sütun ayrı bir hattır.
     
     Parameters:
     -----------
-    failure_rates : list
-        Hata oranları listesi
-    production_counts : list
-        Üretim miktarları listesi
+    failure_rates : list veya np.ndarray
+        Hata oranları
+    production_counts : list veya np.ndarray
+        Üretim miktarları
     
     Returns:
     --------
     tuple : (CL, UCL, LCL)
     """
     # Merkez çizgi (ortalama hata oranı)
-    CL = np.mean(failure_rates)
+    CL = np.mean(failure_rates, axis=0)
     
     # Ortalama üretim miktarı
-    avg_n = np.mean(production_counts)
+    avg_n = np.mean(production_counts, axis=0)
     
-    # Standart sapma
-    std_dev = np.sqrt(CL * (1 - CL) / avg_n)
+    # Standart sapma: sqrt(p(1-p)) * 1/sqrt(n)
+    variance = CL * (1.0 - CL)
+    std_dev = np.sqrt(variance) * np.reciprocal(np.sqrt(avg_n))
     
     # Üst ve alt kontrol limitleri (±3 sigma)
     UCL = CL + 3 * std_dev
     LCL = CL - 3 * std_dev
     
     # LCL negatif olamaz
-    LCL = max(0, LCL)
+    LCL = np.maximum(0, LCL)
     
     return CL, UCL, LCL
 
 
-def inspection(data, CL, UCL, LCL):
+# Açık imza ile çekirdek import sırasında derlenir ve önbelleğe yazılır
+@njit('uint8(float64[:], int64, float64, float64, float64, float64)',
+      cache=True, fastmath=True, boundscheck=False)
+def inspection_core(rates, n, CL, UCL, LCL, mid_upper):
     """
-    Nelson kurallarına dayalı kontrol dışı durum analizi.
-    İlk 4 Nelson kuralını uygular.
+    Nelson kurallarının derlenmiş çekirdeği.
+    rates[:n] üzerinde ilk 4 kuralı, son 7 noktayı sondan başa
+    tek geçişte tarayarak kontrol eder.
     
     Parameters:
     -----------
-    data : list
-        Hata oranları listesi
+    rates : np.ndarray
+        Hata oranları tamponu (float64)
+    n : int
+        Tampondaki geçerli eleman sayısı
     CL : float
         Merkez çizgi
     UCL : float
         Üst kontrol limiti
     LCL : float
         Alt kontrol limiti
+    mid_upper : float
+        CL ile UCL arasının 2/3 noktası
     
     Returns:
     --------
-    list : Tespit edilen durumlar
+    np.uint8 : Tetiklenen kuralların bit maskesi (RULE_* sabitleri)
     """
-    comments = []
-    n = len(data)
+    bits = 0
     
     if n == 0:
-        return comments
+        return np.uint8(bits)
     
     # KURAL 1: Son nokta UCL veya LCL dışında mı?
-    if data[-1] > UCL or data[-1] < LCL:
-        comments.append("⚠️ KURAL 1: Kontrol dışı nokta tespit edildi! (UCL/LCL aşıldı)")
+    last = rates[n - 1]
+    if last > UCL or last < LCL:
+        bits |= RULE_1
+    
+    # Sondan geriye ardışık nokta sayaçları
+    above, below, rising, falling, extreme = True, True, True, True, True
+    c_above = c_below = c_rising = c_falling = c_extreme = 0
+    following = last
+    
+    for k in range(n - 1, max(n - 7, 0) - 1, -1):
+        x = rates[k]
+        
+        # CL'nin üstünde / altında
+        above = above and x > CL
+        below = below and x < CL
+        c_above += above
+        c_below += below
+        
+        # CL ile UCL arasında, uçta (mid_upper > CL)
+        extreme = extreme and x > mid_upper and x < UCL
+        c_extreme += extreme
+        
+        # Bir sonraki noktaya göre artış / azalış
+        if k < n - 1:
+            rising = rising and x < following
+            falling = falling and x > following
+            c_rising += rising
+            c_falling += falling
+        following = x
+        
+        if not (above or below or rising or falling or extreme):
+            break
     
     # KURAL 2: Son 7 nokta CL'nin aynı tarafında mı?
-    if n >= 7:
-        last_7 = data[-7:]
-        above_cl = all(x > CL for x in last_7)
-        below_cl = all(x < CL for x in last_7)
+    if c_above >= 7 or c_below >= 7:
+        bits |= RULE_2
+    
+    # KURAL 3: Art arda 6 artan veya azalan nokta var mı? (5 ardışık fark)
+    if c_rising >= 5:
+        bits |= RULE_3_UP
+    elif c_falling >= 5:
+        bits |= RULE_3_DOWN
+    
+    # KURAL 4: Son 4 nokta CL ile UCL arasında, uçta mı?
+    if c_extreme >= 4:
+        bits |= RULE_4
+    
+    return np.uint8(bits)
+
+
+def inspection(data, CL, UCL, LCL, mid_upper=None):
+    """
+    Nelson kurallarına dayalı kontrol dışı durum analizi.
+    İlk 4 Nelson kuralını uygular.
+    
+    Parameters:
+    -----------
+    data : list veya np.ndarray
+        Hata oranları
+    CL : float
+        Merkez çizgi
+    UCL : float
+        Üst kontrol limiti
+    LCL : float
+        Alt kontrol limiti
+    mid_upper : float
+        CL ile UCL arasının 2/3 noktası (verilmezse hesaplanır)
+    
+    Returns:
+    --------
+    list : Tespit edilen durumlar
+    """
+    rates = np.ascontiguousarray(data, dtype=np.float64)
+    
+    if len(rates) == 0:
+        return []
+    
+    if mid_upper is None:
+        mid_upper = CL + (UCL - CL) * 2 / 3
+    
+    bits = inspection_core(rates, len(rates), CL, UCL, LCL, mid_upper)
+    
+    return [message for i, message in enumerate(_MESSAGES) if bits & (1 << i)] or [_OK]
+
+
+def update_rule_runs(runs, rates, previous, control_limits):
+    """
+    Tüm hatlar için ardışık nokta sayaçlarını bir saat ilerletir ve
+    kurallardan birinin tetiklenebileceği hatları belirler.
+    
+    Parameters:
+    -----------
+    runs : dict
+        Hat başına sayaç dizileri ('above', 'below', 'rising', 'falling', 'extreme');
+        yerinde güncellenir
+    rates : np.ndarray
+        Bu saatin hata oranları
+    previous : np.ndarray
+        Bir önceki saatin hata oranları (ilk saatte NaN)
+    control_limits : dict
+        'CL', 'UCL', 'LCL', 'mid_upper' dizileri
+    
+    Returns:
+    --------
+    np.ndarray : inspection_core ile incelenmesi gereken hatların maskesi
+    """
+    CL = control_limits['CL']
+    UCL = control_limits['UCL']
+    
+    # KURAL 1: UCL/LCL dışındaki noktalar
+    ooc_mask = (rates > UCL) | (rates < control_limits['LCL'])
+    
+    # Koşul sağlandıkça sayaç artar, bozulunca sıfırlanır
+    conditions = {
+        'above': rates > CL,
+        'below': rates < CL,
+        'rising': rates > previous,
+        'falling': rates < previous,
+        'extreme': (rates > control_limits['mid_upper']) & (rates < UCL)
+    }
+    for key, condition in conditions.items():
+        runs[key] = np.where(condition, runs[key] + 1, 0)
+    
+    return (ooc_mask
+            | (runs['above'] >= 7) | (runs['below'] >= 7)
+            | (runs['rising'] >= 5) | (runs['falling'] >= 5)
+            | (runs['extreme'] >= 4))
+
+
+def _build_summary_chart():
+    """
+    Özet grafiğin figürünü ve çizgi nesnelerini bir kez oluşturur.
+    
+    Returns:
+    --------
+    dict : Figür, eksenler ve hat başına çizgi nesneleri (LINE_NAMES sırasıyla)
+    """
+    # matplotlib yalnızca grafik modunda yüklenir (metin modunda açılış hızlanır).
+    # Grafikler yalnızca dosyaya yazılır; pyplot yerine doğrudan Agg tuvali
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig = Figure(figsize=(14, 10))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(4, 2)
+    
+    # Başlık her karede yalnızca metni değiştirilerek güncellenir
+    title = fig.suptitle('', fontsize=16, fontweight='bold')
+    
+    state = {'fig': fig, 'title': title, 'axes': [], 'series': [], 'last_pt': [],
+             'limit_lines': [], 'limits': [None] * N_LINES, 'layout_done': False}
+    
+    for ax, line_name in zip(axes.flat, LINE_NAMES):
+        # Veri serisi
+        series, = ax.plot([], [], marker='o', linestyle='-', 
+                          color='black', markersize=4, linewidth=1.5)
         
-        if above_cl or below_cl:
-            comments.append("⚠️ KURAL 2: Sistematik kayma tespit edildi! (7 ardışık nokta CL'nin aynı tarafında)")
-    
-    # KURAL 3: Art arda 6 artan veya azalan nokta var mı?
-    if n >= 6:
-        last_6 = data[-6:]
-        increasing = all(last_6[i] < last_6[i+1] for i in range(5))
-        decreasing = all(last_6[i] > last_6[i+1] for i in range(5))
+        # Kontrol limitleri (CL, UCL, LCL) tek bir çizgi koleksiyonunda;
+        # x ekseni koordinatında 0-1 aralığı = eksenin tüm genişliği
+        limit_lines = ax.hlines([0, 0, 0], 0, 1, transform=ax.get_yaxis_transform(),
+                                colors=['blue', 'red', 'red'], linestyles='--',
+                                linewidth=1.5, alpha=0.7)
         
-        if increasing:
-            comments.append("⚠️ KURAL 3: Artan trend tespit edildi! (6 ardışık artan nokta)")
-        elif decreasing:
-            comments.append("⚠️ KURAL 3: Azalan trend tespit edildi! (6 ardışık azalan nokta)")
-    
-    # KURAL 4: Son 4 nokta CL ile UCL (veya LCL) arasında uçta mı?
-    if n >= 4:
-        last_4 = data[-4:]
-        upper_zone = all(x > CL and x < UCL for x in last_4)
-        # CL ile UCL arası orta noktası
-        mid_upper = CL + (UCL - CL) * 2/3
+        # Son nokta
+        last_pt, = ax.plot([], [], 'o', color='green', markersize=8, zorder=5)
         
-        upper_extreme = all(x > mid_upper for x in last_4)
+        ax.set_title(line_name, fontsize=10, fontweight='bold')
+        ax.set_xlabel('Saat', fontsize=8)
+        ax.set_ylabel('Hata Oranı', fontsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(labelsize=8)
+        
+        # Eksen sınırları create_summary_chart içinde elle ayarlanır
+        ax.set_autoscale_on(False)
         
-        if upper_extreme and upper_zone:
-            comments.append("⚠️ KURAL 4: Varyans artışı olabilir! (4 nokta uçta kümelenmiş)")
+        state['axes'].append(ax)
+        state['series'].append(series)
+        state['last_pt'].append(last_pt)
+        state['limit_lines'].append(limit_lines)
     
-    if not comments:
-        comments.append("✓ Süreç kontrol altında")
+    return state
+
+
+# Özet grafik önbelleği (ilk çağrıda oluşturulur)
+_SUMMARY_CHART = {}
+
+
+def summary_chart_path(output_dir, current_hour):
+    """
+    Verilen saatin özet grafiği için dosya yolunu döndürür.
     
-    return comments
+    Parameters:
+    -----------
+    output_dir : str
+        Çıktı dizini
+    current_hour : int
+        Saat
+    
+    Returns:
+    --------
+    str : PNG dosya yolu
+    """
+    return os.path.join(output_dir, f'summary_hour_{current_hour:03d}.png')
 
 
 def create_summary_chart(all_hourly_data, control_limits, current_hour, output_dir):
     """
     Tüm hatlar için özet grafik oluşturur.
+    Figür ilk çağrıda kurulur, sonraki çağrılarda yalnızca veriler güncellenir.
+    Figür paylaşıldığı için aynı anda tek bir iş parçacığından çağrılmalıdır.
     
     Parameters:
     -----------
     all_hourly_data : dict
-        Tüm hatların saatlik verileri
+        Tüm hatların saatlik verileri ('rates': hat x saat dizisi, 'n': saat sayısı)
     control_limits : dict
-        Tüm hatların kontrol limitleri
+        Tüm hatların kontrol limitleri ('CL', 'UCL', 'LCL' dizileri)
     current_hour : int
         Mevcut saat
     output_dir : str
         Çıktı dizini
     """
-    fig, axes = plt.subplots(4, 2, figsize=(16, 12))
-    fig.suptitle(f'Tüm Hatlar - p-Chart Özeti (Saat: {current_hour})', fontsize=16, fontweight='bold')
+    if not _SUMMARY_CHART:
+        _SUMMARY_CHART.update(_build_summary_chart())
     
-    lines = list(PRODUCTION_LINES.keys())
+    state = _SUMMARY_CHART
+    fig = state['fig']
+    state['title'].set_text(f'Tüm Hatlar - p-Chart Özeti (Saat: {current_hour})')
     
-    for idx, (ax, line_name) in enumerate(zip(axes.flat, lines)):
-        data = all_hourly_data[line_name]
-        limits = control_limits[line_name]
+    n = all_hourly_data['n']
+    hours = np.arange(1, n + 1)
+    CL_arr, UCL_arr, LCL_arr = control_limits['CL'], control_limits['UCL'], control_limits['LCL']
+    
+    for i in range(N_LINES):
+        ax = state['axes'][i]
+        rates = all_hourly_data['rates'][i, :n]
         
-        # Grafik çiz
-        ax.plot(data['hours'], data['rates'], marker='o', linestyle='-', 
-                color='black', markersize=4, linewidth=1.5)
+        # Veri serisini güncelle
+        state['series'][i].set_data(hours, rates)
         
-        # Kontrol limitleri
-        ax.axhline(y=limits['CL'], color='blue', linestyle='--', linewidth=1.5, alpha=0.7)
-        ax.axhline(y=limits['UCL'], color='red', linestyle='--', linewidth=1.5, alpha=0.7)
-        ax.axhline(y=limits['LCL'], color='red', linestyle='--', linewidth=1.5, alpha=0.7)
+        # Kontrol limitleri yalnızca değiştiyse güncellenir; y ekseni
+        # limitleri ve mevcut verileri kapsayacak şekilde yeniden kurulur
+        current_limits = (CL_arr[i], UCL_arr[i], LCL_arr[i])
+        if state['limits'][i] != current_limits:
+            state['limit_lines'][i].set_segments([[(0, y), (1, y)] for y in current_limits])
+            state['limits'][i] = current_limits
+            
+            low, high = min(current_limits), max(current_limits)
+            if n > 0:
+                low, high = min(low, rates.min()), max(high, rates.max())
+            margin = (high - low) * 0.05
+            ax.set_ylim(low - margin, high + margin)
         
-        # Son noktayı vurgula
-        if len(data['rates']) > 0:
-            last_rate = data['rates'][-1]
-            color = 'red' if (last_rate > limits['UCL'] or last_rate < limits['LCL']) else 'green'
-            ax.plot(data['hours'][-1], last_rate, 'o', color=color, markersize=8, zorder=5)
+        x_margin = max(0.5, (n - 1) * 0.05)
+        ax.set_xlim(1 - x_margin, max(n, 1) + x_margin)
         
-        ax.set_title(line_name, fontsize=10, fontweight='bold')
-        ax.set_xlabel('Saat', fontsize=8)
-        ax.set_ylabel('Hata Oranı', fontsize=8)
-        ax.grid(True, alpha=0.3)
-        ax.tick_params(labelsize=8)
+        # Son noktayı vurgula
+        last_pt = state['last_pt'][i]
+        if n > 0:
+            last_rate = rates[-1]
+            color = 'red' if (last_rate > UCL_arr[i] or last_rate < LCL_arr[i]) else 'green'
+            last_pt.set_data([hours[-1]], [last_rate])
+            last_pt.set_color(color)
+            
+            # Herhangi bir nokta eksen kenarına taşıyorsa y eksenini genişlet
+            # (çağrılar arasında atlanan saatler de hesaba katılır)
+            bottom, top = ax.get_ylim()
+            margin = (top - bottom) * 0.05
+            low, high = rates.min(), rates.max()
+            if low - margin < bottom or high + margin > top:
+                ax.set_ylim(min(bottom, low - margin), max(top, high + margin))
+        else:
+            last_pt.set_data([], [])
     
-    plt.tight_layout()
-    filename = os.path.join(output_dir, f'summary_hour_{current_hour:03d}.png')
-    plt.savefig(filename, dpi=150, bbox_inches='tight')
-    plt.close()
+    # Yerleşim, eksen sınırları ilk kez belirlendikten sonra bir kez hesaplanır
+    if not state['layout_done']:
+        fig.tight_layout()
+        state['layout_done'] = True
+    
+    filename = summary_chart_path(output_dir, current_hour)
+    # Hızlı PNG sıkıştırması (daha büyük dosya, daha kısa kayıt süresi)
+    fig.savefig(filename, dpi=100, pil_kwargs={'compress_level': 1})
     
     return filename
 
 
-def initialize_control_limits(line_name, line_data, sigma=0.03):
+def initialize_all_limits(sigma=0.03, warmup=50):
     """
-    Her hat için kontrol limitlerini başlangıçta hesaplar.
-    50 saatlik simülasyon ile CL, UCL, LCL belirler.
+    Tüm hatlar için kontrol limitlerini başlangıçta hesaplar.
+    warmup saatlik simülasyon ile CL, UCL, LCL belirler.
     
     Parameters:
     -----------
-    line_name : str
-        Hat adı
-    line_data : dict
-        Hat verileri (monthly_production, monthly_defects)
     sigma : float
         Varyasyon parametresi
+    warmup : int
+        Simüle edilecek saat sayısı (varsayılan: 50)
     
     Returns:
     --------
-    tuple : (CL, UCL, LCL)
+    dict : 'CL', 'UCL', 'LCL', 'mid_upper' dizileri (LINE_NAMES sırasıyla)
     """
-    failure_rates = []
-    production_counts = []
-    
-    # 50 saatlik veri üret
-    for _ in range(50):
-        prod, defects, rate = mhConverter(
-            line_data['monthly_production'],
-            line_data['monthly_defects'],
-            sigma=sigma
-        )
-        failure_rates.append(rate)
-        production_counts.append(prod)
+    # Tüm hatlar için (warmup x hat) veri tek seferde üret
+    production_counts, _, failure_rates = mhConverter(
+        MONTHLY_PRODUCTION,
+        MONTHLY_DEFECTS,
+        sigma=sigma,
+        size=(warmup, N_LINES)
+    )
     
     # Kontrol limitlerini hesapla
     CL, UCL, LCL = calculate_control_limits(failure_rates, production_counts)
     
-    return CL, UCL, LCL
+    return {
+        'CL': CL, 'UCL': UCL, 'LCL': LCL,
+        # Kural 4 eşiği: CL ile UCL arasının 2/3 noktası
+        'mid_upper': CL + (UCL - CL) * 2 / 3
+    }
 
 
-def run_simulation(sigma=0.03, mode='text'):
+def run_simulation(sigma=0.03, mode='text', seed=None, interval=None):
     """
     Ana simülasyon döngüsü.
     
@@ -273,12 +524,21 @@ def run_simulation(sigma=0.03, mode='text'):
         Varyasyon parametresi (0.03 = kontrol altında, daha yüksek = varyans artışı)
     mode : str
         'text' = sadece metin, 'summary' = özet grafik, 'detailed' = her hat için ayrı grafik
+    seed : int
+        Rastgele sayı üreteci tohumu (verilirse simülasyon tekrarlanabilir)
+    interval : float
+        Otomatik modda saatler arası süre (saniye); None = her saat ENTER beklenir
     """
+    if seed is not None:
+        set_seed(seed)
+    
     print("=" * 80)
     print("SPC SİMÜLASYONU BAŞLADI")
     print("=" * 80)
     print(f"Varyasyon Parametresi (Sigma): {sigma}")
     print(f"Mod: {mode}")
+    if seed is not None:
+        print(f"Tohum (Seed): {seed}")
     print("=" * 80)
     
     # Çıktı dizini oluştur
@@ -288,83 +548,176 @@ def run_simulation(sigma=0.03, mode='text'):
         os.makedirs(output_dir, exist_ok=True)
         print(f"\n📁 Grafikler kaydedilecek: {output_dir}/")
     
+    # Grafikler arka planda tek bir iş parçacığında kaydedilir
+    saver = ThreadPoolExecutor(max_workers=1) if mode == 'summary' else None
+    pending_chart = None
+    
     # Tüm hatlar için kontrol limitlerini başlangıçta hesapla
-    control_limits = {}
     print("\n📊 Kontrol limitleri hesaplanıyor...\n")
+    control_limits = initialize_all_limits(sigma=0.03)
+    CL_arr = control_limits['CL']
+    UCL_arr = control_limits['UCL']
+    LCL_arr = control_limits['LCL']
+    mid_upper_arr = control_limits['mid_upper']
     
-    for line_name, line_data in PRODUCTION_LINES.items():
-        CL, UCL, LCL = initialize_control_limits(line_name, line_data, sigma=0.03)
-        control_limits[line_name] = {'CL': CL, 'UCL': UCL, 'LCL': LCL}
-        print(f"{line_name:20s} | CL: {CL:.5f} | UCL: {UCL:.5f} | LCL: {LCL:.5f}")
+    for i in range(N_LINES):
+        print(f"{LINE_NAMES[i]:20s} | CL: {CL_arr[i]:.5f} | UCL: {UCL_arr[i]:.5f} | LCL: {LCL_arr[i]:.5f}")
     
     print("\n" + "=" * 80)
     print("Kontrol limitleri hazır. Simülasyon başlatılıyor...")
-    print("Devam etmek için ENTER, çıkmak için 'q' yazın.")
+    if interval is None:
+        print("Devam etmek için ENTER, çıkmak için 'q' yazın.")
+    else:
+        print(f"Otomatik mod: her {interval} saniyede bir saat. Çıkmak için Ctrl+C.")
     print("=" * 80 + "\n")
     
     # Saatlik veriler için hafıza
-    hourly_data = {line: {'hours': [], 'rates': [], 'productions': []} 
-                   for line in PRODUCTION_LINES.keys()}
+    # (hat x saat boyutunda önceden ayrılmış diziler + yazma imleci)
+    hourly_data = {'rates': np.empty((N_LINES, INITIAL_CAPACITY), dtype=np.float64),
+                   'productions': np.empty((N_LINES, INITIAL_CAPACITY), dtype=np.int64),
+                   'n': 0}
+    
+    # Kural 2-4 için hat başına ardışık nokta sayaçları
+    rule_runs = {key: np.zeros(N_LINES, dtype=np.int64)
+                 for key in ('above', 'below', 'rising', 'falling', 'extreme')}
     
     current_hour = 1
+    completed_hours = 0
     
-    while True:
-        print(f"\n{'='*80}")
-        print(f"SAAT: {current_hour}")
-        print(f"{'='*80}\n")
-        
-        # Her hat için saatlik veri üret ve analiz et
-        for line_name, line_data in PRODUCTION_LINES.items():
-            limits = control_limits[line_name]
+    try:
+        while True:
+            t_start = time.perf_counter()
+            
+            # Saatlik rapor tek parça halinde yazdırılır
+            out = [f"\n{'='*80}\nSAAT: {current_hour}\n{'='*80}\n\n"]
             
-            # Saatlik veri üret
-            prod, defects, rate = mhConverter(
-                line_data['monthly_production'],
-                line_data['monthly_defects'],
+            # Tüm hatlar için saatlik veriyi tek seferde üret
+            productions, defects_arr, rates = mhConverter(
+                MONTHLY_PRODUCTION,
+                MONTHLY_DEFECTS,
                 sigma=sigma
             )
             
-            # Hafızaya ekle
-            hourly_data[line_name]['hours'].append(current_hour)
-            hourly_data[line_name]['rates'].append(rate)
-            hourly_data[line_name]['productions'].append(prod)
+            # Hafızaya ekle (kapasite dolduysa iki katına çıkar)
+            n = hourly_data['n']
+            previous = hourly_data['rates'][:, n - 1] if n > 0 else np.full(N_LINES, np.nan)
             
-            # Kontrol analizi
-            comments = inspection(
-                hourly_data[line_name]['rates'],
-                limits['CL'],
-                limits['UCL'],
-                limits['LCL']
-            )
+            # Yalnızca kuralı tetiklenebilecek hatlar ayrıntılı incelenir
+            candidates = update_rule_runs(rule_runs, rates, previous, control_limits)
             
-            # Sonuçları yazdır
-            print(f"📍 {line_name}")
-            print(f"   Üretim: {prod:,} | Hata: {defects} | Oran: {rate:.5f}")
-            for comment in comments:
-                print(f"   {comment}")
-            print()
-        
-        # Grafik oluştur
-        if mode == 'summary':
-            filename = create_summary_chart(hourly_data, control_limits, current_hour, output_dir)
-            print(f"📊 Özet grafik kaydedildi: {filename}\n")
-        
-        # Kullanıcı girişi
-        user_input = input("\n▶ Devam için ENTER, çıkış için 'q': ").strip().lower()
-        
-        if user_input == 'q':
-            print("\n" + "="*80)
-            print("Simülasyon sonlandırıldı.")
-            print(f"Toplam {current_hour} saat simüle edildi.")
-            if mode != 'text':
-                print(f"Grafikler kaydedildi: {output_dir}/")
-            print("="*80)
-            break
-        
-        current_hour += 1
+            if n == hourly_data['rates'].shape[1]:
+                for key in ('rates', 'productions'):
+                    grown = np.empty((N_LINES, 2 * n), dtype=hourly_data[key].dtype)
+                    grown[:, :n] = hourly_data[key]
+                    hourly_data[key] = grown
+            hourly_data['rates'][:, n] = rates
+            hourly_data['productions'][:, n] = productions
+            n += 1
+            hourly_data['n'] = n
+            
+            # Her hat için analiz et
+            for i in range(N_LINES):
+                prod, defects, rate = int(productions[i]), int(defects_arr[i]), float(rates[i])
+                
+                # Kontrol analizi
+                if candidates[i]:
+                    comments = inspection(
+                        hourly_data['rates'][i, :n],
+                        CL_arr[i],
+                        UCL_arr[i],
+                        LCL_arr[i],
+                        mid_upper_arr[i]
+                    )
+                else:
+                    comments = [_OK]
+                
+                # Sonuçları rapora ekle
+                out.append(f"📍 {LINE_NAMES[i]}\n   Üretim: {prod:,} | Hata: {defects} | Oran: {rate:.5f}\n")
+                out.extend(f"   {comment}\n" for comment in comments)
+                out.append("\n")
+            
+            # Grafik oluştur
+            if mode == 'summary':
+                # Önceki grafik bitmeden yenisi kuyruğa alınmaz (hata varsa burada yükselir)
+                if pending_chart is not None:
+                    pending_chart.result()
+                
+                snapshot = {'rates': hourly_data['rates'][:, :n].copy(), 'n': n}
+                pending_chart = saver.submit(create_summary_chart, snapshot, control_limits,
+                                             current_hour, output_dir)
+                out.append(f"📊 Özet grafik kaydediliyor: {summary_chart_path(output_dir, current_hour)}\n\n")
+            
+            sys.stdout.write(''.join(out))
+            # Otomatik modda input() çıktıyı boşaltmaz; dosya/boru çıktısında
+            # raporlar saatlik olarak görünsün
+            sys.stdout.flush()
+            
+            completed_hours = current_hour
+            
+            if interval is None:
+                # Kullanıcı girişi (girdi akışı kapandıysa çıkış sayılır)
+                try:
+                    user_input = input("\n▶ Devam için ENTER, çıkış için 'q': ").strip().lower()
+                except EOFError:
+                    user_input = 'q'
+                
+                if user_input == 'q':
+                    break
+            else:
+                # Otomatik mod: sabit aralık için kalan süre kadar bekle
+                time.sleep(max(0, interval - (time.perf_counter() - t_start)))
+            
+            current_hour += 1
+    except KeyboardInterrupt:
+        print()
+    
+    if saver is not None:
+        saver.shutdown(wait=True)
+        if pending_chart is not None:
+            pending_chart.result()
+    
+    print("\n" + "="*80)
+    print("Simülasyon sonlandırıldı.")
+    print(f"Toplam {completed_hours} saat simüle edildi.")
+    if mode != 'text':
+        print(f"Grafikler kaydedildi: {output_dir}/")
+    print("="*80)
+
+
+def _non_negative_float(value):
+    """
+    argparse için negatif olmayan ondalık sayı dönüştürücüsü.
+    
+    Parameters:
+    -----------
+    value : str
+        Komut satırı değeri
+    
+    Returns:
+    --------
+    float : Dönüştürülmüş değer
+    """
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"negatif olamaz: {value}")
+    return number
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kamera kontrollü ambalaj hatları için SPC simülasyonu")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Rastgele sayı üreteci tohumu (tekrarlanabilir simülasyon için)")
+    parser.add_argument('--auto', type=_non_negative_float, default=None, metavar='PERIOD',
+                        help="ENTER beklemeden her PERIOD saniyede bir saat simüle et (soru sorulmaz)")
+    parser.add_argument('--sigma', type=float, default=None,
+                        help="Varyasyon parametresi (verilmezse sorulur; --auto ile varsayılan 0.03)")
+    parser.add_argument('--mode', choices=['text', 'summary'], default=None,
+                        help="Görselleştirme modu (verilmezse sorulur; --auto ile varsayılan text)")
+    args = parser.parse_args()
+    
+    # Otomatik modda hiçbir giriş beklenmez (cron/systemd/nohup ile çalışabilir)
+    unattended = args.auto is not None
+    
     print("""
     ╔════════════════════════════════════════════════════════════════════════╗
     ║  KAMERA KONTROLLÜ AMBALAJ HATLARI İÇİN                                ║
@@ -372,36 +725,46 @@ if __name__ == "__main__":
     ╚════════════════════════════════════════════════════════════════════════╝
     """)
     
-    print("\n1. Sigma değeri seçin:")
-    print("  0.03 = Kontrol altında (düşük varyans)")
-    print("  0.10 = Orta seviye varyans")
-    print("  0.20 = Yüksek varyans")
-    print("  0.30 = Çok yüksek varyans")
-    
-    try:
-        sigma_input = input("\nSigma değeri (varsayılan 0.03): ").strip()
-        sigma = float(sigma_input) if sigma_input else 0.03
-    except:
-        sigma = 0.03
-        print("Geçersiz giriş, varsayılan değer (0.03) kullanılıyor.")
-    
-    print("\n2. Görselleştirme modu seçin:")
-    print("  1 = Sadece metin çıktısı (hızlı)")
-    print("  2 = Özet grafik (8 hat tek sayfada)")
-    
-    try:
-        mode_input = input("\nMod seçimi (1/2, varsayılan 1): ").strip()
-        if mode_input == '2':
-            mode = 'summary'
-            print("✓ Özet grafikler oluşturulacak.")
-        else:
+    if args.sigma is not None or unattended:
+        sigma = args.sigma if args.sigma is not None else 0.03
+    else:
+        print("\n1. Sigma değeri seçin:")
+        print("  0.03 = Kontrol altında (düşük varyans)")
+        print("  0.10 = Orta seviye varyans")
+        print("  0.20 = Yüksek varyans")
+        print("  0.30 = Çok yüksek varyans")
+        
+        try:
+            sigma_input = input("\nSigma değeri (varsayılan 0.03): ").strip()
+            sigma = float(sigma_input) if sigma_input else 0.03
+        except:
+            sigma = 0.03
+            print("Geçersiz giriş, varsayılan değer (0.03) kullanılıyor.")
+    
+    if args.mode is not None or unattended:
+        mode = args.mode if args.mode is not None else 'text'
+    else:
+        print("\n2. Görselleştirme modu seçin:")
+        print("  1 = Sadece metin çıktısı (hızlı)")
+        print("  2 = Özet grafik (8 hat tek sayfada)")
+        
+        try:
+            mode_input = input("\nMod seçimi (1/2, varsayılan 1): ").strip()
+            if mode_input == '2':
+                mode = 'summary'
+                print("✓ Özet grafikler oluşturulacak.")
+            else:
+                mode = 'text'
+                print("✓ Sadece metin çıktısı kullanılacak.")
+        except:
             mode = 'text'
-            print("✓ Sadece metin çıktısı kullanılacak.")
-    except:
-        mode = 'text'
     
-    print("\n" + "="*80)
-    input("Başlamak için ENTER'a basın...")
-    print()
+    if not unattended:
+        print("\n" + "="*80)
+        try:
+            input("Başlamak için ENTER'a basın...")
+        except EOFError:
+            pass
+        print()
     
-    run_simulation(sigma=sigma, mode=mode)
+    run_simulation(sigma=sigma, mode=mode, seed=args.seed, interval=args.auto)